@@ -1,9 +1,9 @@
 """
 Flask application entry point.
 Run with: python app.py
-Or use: flask run (with FLASK_APP=src.receipe_transcriber)
+Or use: flask run (with FLASK_APP=receipe_transcriber)
 """
-from src.receipe_transcriber import create_app
+from receipe_transcriber import create_app
 
 app = create_app()
 
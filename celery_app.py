@@ -1,3 +1,5 @@
 """Entry point for Celery worker (lean, no Flask app context)."""
 
-from src.receipe_transcriber import celery
+# Import through the installed package name so the worker shares the same
+# Celery instance the tasks register against.
+from receipe_transcriber.celery_app import celery  # noqa: F401
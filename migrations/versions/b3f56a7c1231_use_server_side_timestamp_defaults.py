@@ -0,0 +1,48 @@
+"""Use server-side defaults for created_at/updated_at timestamps
+
+Revision ID: b3f56a7c1231
+Revises: 92bf337eb60e
+Create Date: 2026-10-14 10:03:17.640512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f56a7c1231'
+down_revision = '92bf337eb60e'
+branch_labels = None
+depends_on = None
+
+
+TIMESTAMP_COLUMNS = {
+    'transcription_jobs': ['created_at'],
+    'recipes': ['created_at', 'updated_at'],
+    'ingredients': ['created_at'],
+    'instructions': ['created_at'],
+}
+
+
+def upgrade():
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=False,
+                    server_default=sa.text('CURRENT_TIMESTAMP'),
+                )
+
+
+def downgrade():
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=False,
+                    server_default=None,
+                )
@@ -11,7 +11,7 @@ echo ""
 echo "Starting Flask development server..."
 echo ""
 
-export FLASK_APP=src.receipe_transcriber
+export FLASK_APP=receipe_transcriber
 export FLASK_ENV=development
 
 flask run
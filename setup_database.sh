@@ -5,7 +5,7 @@ echo "===================================="
 echo ""
 
 # Set Flask app
-export FLASK_APP=src.receipe_transcriber
+export FLASK_APP=receipe_transcriber
 
 # Check if migrations folder exists
 if [ ! -d "migrations" ]; then
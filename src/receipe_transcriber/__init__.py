@@ -1,15 +1,14 @@
 import os
 
 from flask import Flask
-from flask_migrate import Migrate
+from sqlalchemy import event
 from turbo_flask import Turbo
 
-from .config import Config
+from .config import Config, engine_options
 
 # Import db from models (single source of truth)
 from .models import db
 
-migrate = Migrate()
 turbo = Turbo()
 
 
@@ -20,6 +19,16 @@ def make_celery(app):
     return init_celery(app)
 
 
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    """Use WAL so readers aren't blocked while an upload commits."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     turbo.init_app(app)
@@ -35,12 +44,26 @@ def create_app(config_class=Config):
     if not app.config.get("REDIS_URL"):
         app.config["REDIS_URL"] = "redis://localhost:6379/0"
 
+    # Pool settings depend on the database actually in use, not the default
+    if app.config.get("SQLALCHEMY_ENGINE_OPTIONS") is None:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+            app.config["SQLALCHEMY_DATABASE_URI"]
+        )
+
     # Ensure upload folder exists
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Imported here so Celery workers and task tests, which import this
+    # package but never migrate, don't pay for loading alembic
+    from flask_migrate import Migrate
+
+    Migrate(app, db)
+
+    with app.app_context():
+        if db.engine.url.drivername.startswith("sqlite"):
+            event.listen(db.engine, "connect", _set_sqlite_pragmas)
 
     # Initialize Celery
     make_celery(app)
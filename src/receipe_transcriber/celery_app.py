@@ -3,6 +3,10 @@
 import os
 
 from celery import Celery
+from kombu import Queue
+
+# Override to point transcriptions at a differently named queue per deployment
+TRANSCRIPTION_QUEUE = os.environ.get("TRANSCRIPTION_QUEUE", "transcription")
 
 celery = Celery(
     "receipe_transcriber",
@@ -17,6 +21,18 @@ celery.conf.update(
     timezone="UTC",
     enable_utc=True,
     broker_connection_retry_on_startup=True,
+    # Gevent web workers publish from many greenlets at once; keep enough pooled
+    # broker connections that they don't wait on (or reopen) the default 10
+    broker_pool_limit=50,
+    # Transcriptions get their own queue so they can be served by a gevent
+    # worker (the task mostly waits on Ollama). Workers started without -Q
+    # still consume both queues.
+    task_queues=(Queue("celery"), Queue(TRANSCRIPTION_QUEUE)),
+    task_routes={
+        "receipe_transcriber.tasks.transcription_tasks.transcribe_recipe_task": {
+            "queue": TRANSCRIPTION_QUEUE
+        },
+    },
 )
 
 # Import tasks to register them; no Flask app context needed
@@ -4,14 +4,31 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent.parent
 
 
+def engine_options(database_uri):
+    """SQLAlchemy engine options suited to the database behind database_uri."""
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+        'query_cache_size': 1200,
+    }
+    if database_uri.startswith('sqlite'):
+        # SQLite keeps SQLAlchemy's default pool; its connections only need
+        # to be usable from the threads serving requests
+        options['connect_args'] = {'check_same_thread': False}
+    else:
+        # Gevent workers serve many requests at once; the default pool of 5
+        # connections queues them behind each other
+        options.update(pool_size=20, max_overflow=10, pool_timeout=30)
+    return options
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{BASE_DIR / "app.db"}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-    }
+    # Left unset so create_app derives it from the effective database URI
+    # (see engine_options); set it in a subclass to override.
+    SQLALCHEMY_ENGINE_OPTIONS = None
     
     # Celery configuration
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL') or 'redis://localhost:6379/0'
@@ -23,7 +40,7 @@ class Config:
     # Upload configuration
     UPLOAD_FOLDER = BASE_DIR / 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
+    ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'webp'})
     
     # Ollama configuration
     # Vision model for first pass (handwriting OCR)
@@ -1,8 +1,8 @@
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Optional
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 db = SQLAlchemy()
@@ -10,6 +10,10 @@ db = SQLAlchemy()
 
 class Recipe(db.Model):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Supports the newest-first recipe listings: ORDER BY created_at, id
+        Index("ix_recipes_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     external_recipe_id: Mapped[str] = mapped_column(
@@ -22,13 +26,10 @@ class Recipe(db.Model):
     notes: Mapped[Optional[str]] = mapped_column(Text, default=None)
     image_path: Mapped[Optional[str]] = mapped_column(String(500), default=None)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+        DateTime, server_default=func.now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
-        nullable=False,
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
     ingredients: Mapped[list["Ingredient"]] = relationship(
@@ -73,7 +74,7 @@ class Ingredient(db.Model):
     unit: Mapped[Optional[str]] = mapped_column(String(50), default=None)
     order: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+        DateTime, server_default=func.now(), nullable=False
     )
 
     recipe: Mapped["Recipe"] = relationship(back_populates="ingredients", lazy=True)
@@ -102,7 +103,7 @@ class Instruction(db.Model):
     step_number: Mapped[int] = mapped_column(Integer, nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+        DateTime, server_default=func.now(), nullable=False
     )
 
     recipe: Mapped["Recipe"] = relationship(back_populates="instructions", lazy=True)
@@ -121,6 +122,14 @@ class Instruction(db.Model):
 
 class TranscriptionJob(db.Model):
     __tablename__ = "transcription_jobs"
+    __table_args__ = (
+        # Supports the active job lookup: completed_at IS NULL ORDER BY created_at
+        Index(
+            "ix_transcription_jobs_completed_at_created_at",
+            "completed_at",
+            "created_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     external_recipe_id: Mapped[str] = mapped_column(
@@ -136,7 +145,7 @@ class TranscriptionJob(db.Model):
     )
     error_message: Mapped[Optional[str]] = mapped_column(Text, default=None)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+        DateTime, server_default=func.now(), nullable=False
     )
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=None)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=None)
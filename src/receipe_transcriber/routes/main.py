@@ -1,33 +1,115 @@
-import os
+import re
+import secrets
+import shutil
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from flask import (
     Blueprint,
     current_app,
     flash,
+    make_response,
     redirect,
     render_template,
     request,
     session,
     url_for,
 )
+from sqlalchemy import insert, lambda_stmt, select
+from sqlalchemy.orm import joinedload, load_only, selectinload
 from werkzeug.utils import secure_filename
 
 from receipe_transcriber.models import Ingredient, Instruction, Recipe, TranscriptionJob
-from receipe_transcriber.tasks.transcription_tasks import transcribe_recipe_task
+from receipe_transcriber.tasks.transcription_tasks import (
+    delete_image_file,
+    transcribe_recipe_task,
+)
 
-from .. import db, turbo
+from .. import celery, db, turbo
 
 bp = Blueprint("main", __name__)
 
+# Uploaded files are written to disk on a small pool so multi-file uploads
+# overlap their disk writes instead of saving one file after another.
+_upload_executor = ThreadPoolExecutor(max_workers=4)
 
-def allowed_file(filename):
-    return (
-        "." in filename
-        and filename.rsplit(".", 1)[1].lower()
-        in current_app.config["ALLOWED_EXTENSIONS"]
+
+# render_results_area() runs on every page load and most webhook pushes. Building its
+# statements as lambda_stmt lets SQLAlchemy reuse the constructed statement and
+# its cache key instead of rebuilding both on every call.
+_ACTIVE_JOBS_STMT = lambda_stmt(
+    lambda: select(TranscriptionJob)
+    .where(TranscriptionJob.completed_at.is_(None))
+    .order_by(TranscriptionJob.created_at.asc(), TranscriptionJob.id.asc())
+)
+
+# How many recipes the results area lists below the active jobs
+RECENT_RECIPES_LIMIT = 5
+
+# external_recipe_id is unique on transcription_jobs, so the outer join yields
+# at most one job row per recipe.
+_RECENT_RECIPES_STMT = lambda_stmt(
+    lambda: select(Recipe, TranscriptionJob)
+    .options(
+        load_only(
+            Recipe.external_recipe_id,
+            Recipe.title,
+            Recipe.prep_time,
+            Recipe.cook_time,
+            Recipe.servings,
+            Recipe.notes,
+        ),
+        selectinload(Recipe.ingredients),
+        selectinload(Recipe.instructions),
+    )
+    .outerjoin(
+        TranscriptionJob,
+        TranscriptionJob.external_recipe_id == Recipe.external_recipe_id,
     )
+    .order_by(Recipe.created_at.desc(), Recipe.id.desc())
+    .limit(RECENT_RECIPES_LIMIT)
+)
+
+
+# Matches edit form keys such as "ingredients[0][item]" or
+# "instructions[2][description]"
+_FORM_FIELD_RE = re.compile(
+    r"^(ingredients|instructions)\[(\d+)\]\[(item|quantity|unit|description)\]$"
+)
+
+
+def _save_upload(stream, filepath):
+    """Copy an uploaded file stream to disk in 1 MiB chunks."""
+    with open(filepath, "wb") as out:
+        shutil.copyfileobj(stream, out, length=1 << 20)
+
+
+def webhook_urls():
+    """Return the absolute (update_status, record_recipe) webhook URLs.
+
+    url_for has to walk the URL map on every call, and these URLs only depend
+    on the host the request came in on, so they are built once per host and
+    cached on the app.
+    """
+    cache = current_app.extensions.setdefault("webhook_urls", {})
+    host_url = request.host_url
+    urls = cache.get(host_url)
+    if urls is None:
+        urls = (
+            url_for("webhooks.update_status", _external=True),
+            url_for("webhooks.record_recipe", _external=True),
+        )
+        # The Host header is client controlled; don't let it grow the cache
+        if len(cache) < 16:
+            cache[host_url] = urls
+    return urls
+
+
+def allowed_file(filename):
+    _, dot, extension = filename.rpartition(".")
+    return bool(dot) and extension.lower() in current_app.config["ALLOWED_EXTENSIONS"]
 
 
 @bp.route("/")
@@ -35,51 +117,67 @@ def index():
     """Main page with upload/camera interface."""
 
     if "session_id" not in session:
-        session["session_id"] = str(uuid.uuid4())
+        session["session_id"] = secrets.token_urlsafe(16)
 
     return render_template("index.html")
 
 
 @bp.route("/recipes")
 def recipes():
+    """Results area frame. Unchanged content revalidates with a bodyless 304."""
+    response = make_response(render_results_area())
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def render_results_area():
+    """Render the active jobs and recent recipes shown in the results area."""
     from datetime import datetime, timedelta, timezone
 
     # Define timeout threshold (e.g., 10 minutes)
     TIMEOUT_MINUTES = 10
-    timeout_threshold = datetime.now(timezone.utc) - timedelta(minutes=TIMEOUT_MINUTES)
+    now = datetime.now(timezone.utc)
+    # created_at is filled in by the database default (func.now()) and compared
+    # here as naive UTC. That holds for SQLite, whose CURRENT_TIMESTAMP is UTC.
+    # A server database only matches it if its session time zone is UTC;
+    # config.engine_options doesn't set one, so configure that on the server.
+    timeout_threshold = now.replace(tzinfo=None) - timedelta(minutes=TIMEOUT_MINUTES)
 
     # Get all incomplete jobs
-    active_transcription_jobs = (
-        db.session.query(TranscriptionJob)
-        .filter(TranscriptionJob.completed_at == None)  # noqa: E711
-        .order_by(TranscriptionJob.created_at.asc())
-        .all()
-    )
+    active_transcription_jobs = db.session.scalars(_ACTIVE_JOBS_STMT).all()
 
-    # Check for timed out jobs and mark them as failed
-    for job in active_transcription_jobs:
-        if job.status == "processing":
-            # Make created_at timezone-aware if it's naive (for SQLite compatibility)
-            job_created_at = job.created_at
-            if job_created_at.tzinfo is None:
-                job_created_at = job_created_at.replace(tzinfo=timezone.utc)
-
-            if job_created_at < timeout_threshold:
-                job.status = "failed"
-                job.error_message = (
+    # Mark timed out jobs as failed in a single UPDATE
+    timed_out = (
+        db.session.query(TranscriptionJob)
+        .filter(
+            TranscriptionJob.completed_at.is_(None),
+            TranscriptionJob.status == "processing",
+            TranscriptionJob.created_at < timeout_threshold,
+        )
+        .update(
+            {
+                "status": "failed",
+                "error_message": (
                     "Processing timed out. Please try reprocessing this recipe."
-                )
-                job.completed_at = datetime.now(timezone.utc)
-
-    db.session.commit()
-
-    recent_recipes = (
-        db.session.query(Recipe).order_by(Recipe.created_at.desc()).limit(5)
+                ),
+                "completed_at": now,
+            },
+            synchronize_session=False,
+        )
     )
+    if timed_out:
+        # Committing expires the loaded jobs, so they re-read as failed
+        db.session.commit()
+
+    # Fetch recent recipes together with their transcription job in one query
+    recent_rows = db.session.execute(_RECENT_RECIPES_STMT).all()
+    recent_recipes = [recipe for recipe, _ in recent_rows]
+    job_map = {recipe.id: job for recipe, job in recent_rows}
 
     return render_template(
         "components/recent_recipes.html",
         recent_recipes=recent_recipes,
+        job_map=job_map,
         active_transcription_jobs=active_transcription_jobs,
     )
 
@@ -87,7 +185,23 @@ def recipes():
 @bp.route("/recipes-gallery")
 def recipes_gallery():
     """View all successfully processed recipes."""
-    all_recipes = db.session.query(Recipe).order_by(Recipe.created_at.desc()).all()
+    # The gallery only shows summary fields, so skip hydrating notes/paths
+    all_recipes = (
+        db.session.query(Recipe)
+        .options(
+            load_only(
+                Recipe.external_recipe_id,
+                Recipe.title,
+                Recipe.prep_time,
+                Recipe.cook_time,
+                Recipe.servings,
+            ),
+            # Cards show an ingredient count; load them all in one query
+            selectinload(Recipe.ingredients),
+        )
+        .order_by(Recipe.created_at.desc(), Recipe.id.desc())
+        .all()
+    )
 
     return render_template(
         "recipes_gallery.html",
@@ -95,6 +209,61 @@ def recipes_gallery():
     )
 
 
+def _new_upload_job(original_filename, session_id, upload_dir):
+    """Build the row for a pending upload job and the path its image is saved to."""
+    # One random ID names both the job and its image file
+    external_recipe_id = uuid.uuid4().hex
+    filename = secure_filename(original_filename)
+    filepath = upload_dir / f"{external_recipe_id}_{filename}"
+
+    # Transcription job row with session_id
+    job = {
+        "external_recipe_id": external_recipe_id,
+        "session_id": session_id,
+        "image_path": str(filepath),
+        "status": "pending",
+        "last_status": "Upload received. Queued for processing...",
+    }
+    return job, filepath
+
+
+def _queue_transcriptions(jobs):
+    """Persist new job rows and start a transcription task for each."""
+    # Insert every job with one executemany in a single transaction before
+    # queueing any work; the IDs are generated here, so nothing is read back
+    db.session.execute(insert(TranscriptionJob), jobs)
+    db.session.commit()
+
+    # Other open pages only learn about new jobs from a push (status updates
+    # replace a job's existing card). Send just the new cards: re-rendering the
+    # results area here would also consume this request's flashed messages.
+    if turbo.can_push():
+        turbo.push(
+            [
+                turbo.prepend(
+                    render_template("components/job_card.html", job=job),
+                    target="results-area",
+                )
+                for job in jobs
+            ]
+        )
+
+    # Start Celery tasks with URLs, publishing the whole batch on one pooled
+    # producer (and its broker connection) instead of acquiring one per task
+    status_url, record_url = webhook_urls()
+    with celery.producer_or_acquire() as producer:
+        for job in jobs:
+            transcribe_recipe_task.apply_async(
+                args=[
+                    job["image_path"],
+                    status_url,
+                    record_url,
+                    job["external_recipe_id"],
+                ],
+                producer=producer,
+            )
+
+
 @bp.route("/upload", methods=["POST"])
 def upload_image():
     """Handle image upload(s) and start transcription. Returns pending job card(s)."""
@@ -107,73 +276,111 @@ def upload_image():
 
     # Ensure session has a session_id
     if "session_id" not in session:
-        session["session_id"] = str(uuid.uuid4())
+        session["session_id"] = secrets.token_urlsafe(16)
 
     session_id = session["session_id"]
+    upload_dir = Path(current_app.config["UPLOAD_FOLDER"])
+
+    new_jobs = []
+    pending_saves = []
 
     for file in files:
         if not file or not file.filename:
             continue
 
         if not allowed_file(file.filename):
-            flash(
-                render_template(
-                    "components/invalid_file_type.html", filename=file.filename
-                )
+            # Render straight from the env's compiled-template cache; this
+            # fragment needs no context processors
+            invalid_file_template = current_app.jinja_env.get_template(
+                "components/invalid_file_type.html"
             )
+            flash(invalid_file_template.render(filename=file.filename))
             continue
 
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        filepath = Path(current_app.config["UPLOAD_FOLDER"]) / unique_filename
-        file.save(filepath)
-
-        # Create transcription job with session_id
-        job = TranscriptionJob(
-            external_recipe_id=str(uuid.uuid1()),
-            session_id=session_id,
-            image_path=str(filepath),
-            status="pending",
-            last_status="Upload received. Queued for processing...",
+        job, filepath = _new_upload_job(file.filename, session_id, upload_dir)
+        pending_saves.append(
+            _upload_executor.submit(_save_upload, file.stream, filepath)
         )
+        new_jobs.append(job)
 
-        db.session.add(job)
-        db.session.commit()
+    # Wait for every file to land on disk before any job can be picked up
+    for pending_save in pending_saves:
+        pending_save.result()
 
-        # Start Celery task with URLs
-        transcribe_recipe_task.apply_async(
-            args=[
-                str(filepath),
-                url_for("webhooks.update_status", _external=True),
-                url_for("webhooks.record_recipe", _external=True),
-                job.external_recipe_id,
-            ]
-        )
+    if new_jobs:
+        _queue_transcriptions(new_jobs)
 
     return redirect(url_for("main.index"))
 
 
+@bp.route("/upload/<string:filename>", methods=["PUT"])
+def upload_raw_image(filename):
+    """Handle a single image sent as the raw request body (camera capture)."""
+    if not allowed_file(filename):
+        return "Invalid file type", 400
+
+    if not request.content_length:
+        return "No image data", 400
+
+    # Ensure session has a session_id
+    if "session_id" not in session:
+        session["session_id"] = secrets.token_urlsafe(16)
+
+    job, filepath = _new_upload_job(
+        filename, session["session_id"], Path(current_app.config["UPLOAD_FOLDER"])
+    )
+
+    # Copy the body straight to disk, skipping multipart parsing and the
+    # temporary file werkzeug spools large form parts to
+    _save_upload(request.stream, filepath)
+    _queue_transcriptions([job])
+
+    # Answer with the new job's card rather than a redirect: fetch() only turns
+    # a redirected POST into a GET, so a 302 would replay the PUT against "/"
+    return render_template("components/job_card.html", job=job), 201
+
+
 @bp.route("/recipes/<string:external_recipe_id>/delete", methods=["POST"])
 def delete_recipe(external_recipe_id):
     """Delete a recipe. Turbo will remove the element from DOM."""
-    recipe = (
-        db.session.query(Recipe)
+    # Only the id and image path are needed; don't hydrate the recipe or its
+    # children just to cascade the delete
+    row = (
+        db.session.query(Recipe.id, Recipe.image_path)
         .filter(Recipe.external_recipe_id == external_recipe_id)
         .one_or_none()
     )
 
-    if recipe:
-        # Delete associated file if it exists
-        if recipe.image_path and os.path.exists(recipe.image_path):
-            os.remove(recipe.image_path)
+    if row:
+        recipe_id, image_path = row
 
-        # Delete from database (cascades to ingredients and instructions)
-        db.session.delete(recipe)
+        # Delete the ingredients, instructions and recipe with one statement each
+        db.session.query(Ingredient).filter(Ingredient.recipe_id == recipe_id).delete(
+            synchronize_session=False
+        )
+        db.session.query(Instruction).filter(
+            Instruction.recipe_id == recipe_id
+        ).delete(synchronize_session=False)
+        db.session.query(Recipe).filter(Recipe.id == recipe_id).delete(
+            synchronize_session=False
+        )
         db.session.commit()
 
-        # Refresh entire results area to show remaining recipes
-        return turbo.stream(turbo.replace(recipes(), target="results-area"))
+        # Delete associated file once the rows are gone; the worker does the
+        # unlink so slow storage doesn't hold up the response
+        if image_path:
+            delete_image_file.delay(image_path)
+
+        # Drop just this card rather than re-rendering the whole results area
+        streams = [turbo.remove(target=f"recipe-{external_recipe_id}")]
+        if db.session.query(Recipe.id).limit(1).scalar() is None:
+            streams.append(
+                turbo.append(
+                    render_template("components/empty_state.html"),
+                    target="results-area",
+                )
+            )
+        return turbo.stream(streams)
 
     return redirect(url_for("main.index"))
 
@@ -181,8 +388,10 @@ def delete_recipe(external_recipe_id):
 @bp.route("/recipes/<string:external_recipe_id>/reprocess", methods=["POST"])
 def reprocess_recipe(external_recipe_id):
     """Reprocess an existing recipe. Reuses the same transcription job and recipe ID."""
+    # Load the recipe and its transcription job in one round-trip
     recipe = (
         db.session.query(Recipe)
+        .options(joinedload(Recipe.transcription_job))
         .filter(Recipe.external_recipe_id == external_recipe_id)
         .one_or_none()
     )
@@ -191,16 +400,12 @@ def reprocess_recipe(external_recipe_id):
         return "", 404
 
     # Get or create transcription job for this recipe
-    job = (
-        db.session.query(TranscriptionJob)
-        .filter_by(external_recipe_id=external_recipe_id)
-        .one_or_none()
-    )
+    job = recipe.transcription_job
 
     if not job:
         # Ensure session has a session_id
         if "session_id" not in session:
-            session["session_id"] = str(uuid.uuid4())
+            session["session_id"] = secrets.token_urlsafe(16)
 
         session_id = session["session_id"]
 
@@ -223,11 +428,12 @@ def reprocess_recipe(external_recipe_id):
     db.session.commit()
 
     # Start Celery task using the same recipe ID
+    status_url, record_url = webhook_urls()
     transcribe_recipe_task.apply_async(
         args=[
             recipe.image_path,
-            url_for("webhooks.update_status", _external=True),
-            url_for("webhooks.record_recipe", _external=True),
+            status_url,
+            record_url,
             external_recipe_id,
         ],
         kwargs={"is_reprocessing": True},
@@ -251,7 +457,9 @@ def delete_failed_job(external_recipe_id):
         db.session.commit()
 
         # Refresh entire results area
-        return turbo.stream(turbo.replace(recipes(), target="results-area"))
+        return turbo.stream(
+            turbo.replace(render_results_area(), target="results-area")
+        )
 
     return redirect(url_for("main.index"))
 
@@ -261,6 +469,9 @@ def recipe_detail(external_recipe_id):
     """View a single recipe."""
     recipe = (
         db.session.query(Recipe)
+        .options(
+            selectinload(Recipe.ingredients), selectinload(Recipe.instructions)
+        )
         .filter(Recipe.external_recipe_id == external_recipe_id)
         .one_or_none()
     )
@@ -276,6 +487,9 @@ def edit_recipe(external_recipe_id):
     """Edit a recipe - returns edit form in Turbo frame."""
     recipe = (
         db.session.query(Recipe)
+        .options(
+            selectinload(Recipe.ingredients), selectinload(Recipe.instructions)
+        )
         .filter(Recipe.external_recipe_id == external_recipe_id)
         .one_or_none()
     )
@@ -293,6 +507,11 @@ def recipe_detail_card(external_recipe_id):
     """Return just the recipe card component for Cancel action."""
     recipe = (
         db.session.query(Recipe)
+        .options(
+            selectinload(Recipe.ingredients),
+            selectinload(Recipe.instructions),
+            joinedload(Recipe.transcription_job),
+        )
         .filter(Recipe.external_recipe_id == external_recipe_id)
         .one_or_none()
     )
@@ -337,50 +556,66 @@ def update_recipe(external_recipe_id):
     recipe.servings = request.form.get("servings", "").strip() or None
     recipe.notes = request.form.get("notes", "").strip() or None
 
-    # Delete existing ingredients and instructions (cascade handles this)
-    for ingredient in recipe.ingredients:
-        db.session.delete(ingredient)
-    for instruction in recipe.instructions:
-        db.session.delete(instruction)
-
-    # Parse and create new ingredients
-    ingredient_indices = []
-    for key in request.form.keys():
-        if key.startswith("ingredients[") and key.endswith("][item]"):
-            # Extract index from "ingredients[0][item]"
-            idx = int(key.split("[")[1].split("]")[0])
-            ingredient_indices.append(idx)
-
-    for idx in sorted(set(ingredient_indices)):
-        item = request.form.get(f"ingredients[{idx}][item]", "").strip()
+    # Delete existing ingredients and instructions with one DELETE each rather
+    # than loading every row just to delete it
+    db.session.query(Ingredient).filter(Ingredient.recipe_id == recipe.id).delete(
+        synchronize_session=False
+    )
+    db.session.query(Instruction).filter(Instruction.recipe_id == recipe.id).delete(
+        synchronize_session=False
+    )
+    new_children = []
+
+    # Group ingredient and instruction fields by row index in one pass
+    rows = {"ingredients": defaultdict(dict), "instructions": defaultdict(dict)}
+    for key, value in request.form.items():
+        match = _FORM_FIELD_RE.match(key)
+        if match:
+            section, idx, field = match.groups()
+            rows[section][int(idx)][field] = value.strip()
+
+    # Create new ingredients
+    for idx, fields in sorted(rows["ingredients"].items()):
+        item = fields.get("item")
         if item:  # Only add if item is not empty
-            quantity = (
-                request.form.get(f"ingredients[{idx}][quantity]", "").strip() or None
+            ingredient = Ingredient(
+                item=item,
+                quantity=fields.get("quantity") or None,
+                unit=fields.get("unit") or None,
+                order=idx,
             )
-            unit = request.form.get(f"ingredients[{idx}][unit]", "").strip() or None
+            ingredient.recipe_id = recipe.id
+            new_children.append(ingredient)
 
-            ingredient = Ingredient(item=item, quantity=quantity, unit=unit, order=idx)
-            recipe.ingredients.append(ingredient)
-
-    # Parse and create new instructions
-    instruction_indices = []
-    for key in request.form.keys():
-        if key.startswith("instructions[") and key.endswith("][description]"):
-            # Extract index from "instructions[0][description]"
-            idx = int(key.split("[")[1].split("]")[0])
-            instruction_indices.append(idx)
-
-    for idx in sorted(set(instruction_indices)):
-        description = request.form.get(f"instructions[{idx}][description]", "").strip()
+    # Create new instructions
+    for idx, fields in sorted(rows["instructions"].items()):
+        description = fields.get("description")
         if description:  # Only add if description is not empty
             instruction = Instruction(
                 step_number=idx + 1, description=description  # step_number is 1-indexed
             )
-            recipe.instructions.append(instruction)
+            instruction.recipe_id = recipe.id
+            new_children.append(instruction)
+
+    db.session.add_all(new_children)
 
     # Commit changes
+    recipe_id = recipe.id
     db.session.commit()
 
+    # Committing expired the recipe; reload it with everything the card renders
+    # in one pass instead of lazy loading each relationship
+    recipe = (
+        db.session.query(Recipe)
+        .options(
+            selectinload(Recipe.ingredients),
+            selectinload(Recipe.instructions),
+            joinedload(Recipe.transcription_job),
+        )
+        .filter(Recipe.id == recipe_id)
+        .one()
+    )
+
     # Get the associated transcription job for metadata display
     job = recipe.transcription_job
 
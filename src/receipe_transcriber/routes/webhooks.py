@@ -1,15 +1,112 @@
 from datetime import datetime, timezone
 
-from flask import Blueprint, request
+from flask import Blueprint, render_template, request
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.orm import joinedload, selectinload
 
 from .. import turbo
 from ..models import Ingredient, Instruction, Recipe, TranscriptionJob, db
-from .main import recipes
+from .main import RECENT_RECIPES_LIMIT, render_results_area
 
 bp = Blueprint("webhooks", __name__)
 
 # TODO: Middleware to secure webhook methods.
 
+# Every webhook looks rows up by external_recipe_id; build those statements once
+# so each call reuses the cached compiled SQL without rebuilding the query.
+_JOB_BY_EXTERNAL_ID = select(TranscriptionJob).where(
+    TranscriptionJob.external_recipe_id == bindparam("external_recipe_id")
+)
+_RECIPE_BY_EXTERNAL_ID = select(Recipe).where(
+    Recipe.external_recipe_id == bindparam("external_recipe_id")
+)
+
+# Counts recipes only up to one past what the results area lists, so the check
+# stays cheap however many recipes there are.
+_RECENT_RECIPE_COUNT = select(func.count()).select_from(
+    select(Recipe.id).limit(RECENT_RECIPES_LIMIT + 1).subquery()
+)
+
+
+def push_results_area():
+    """Push a refreshed results area to connected clients, if there are any."""
+    # turbo.push fans out over in-process WebSockets; skip the query and
+    # render entirely when nobody is listening.
+    if turbo.can_push():
+        turbo.push(turbo.replace(render_results_area(), target="results-area"))
+
+
+def push_job_card(external_recipe_id):
+    """Push just the updated job's card to connected clients, if there are any."""
+    if turbo.can_push():
+        job = db.session.execute(
+            _JOB_BY_EXTERNAL_ID, {"external_recipe_id": external_recipe_id}
+        ).scalar_one()
+        turbo.push(
+            turbo.replace(
+                render_template("components/job_card.html", job=job),
+                target=f"recipe-{external_recipe_id}",
+            )
+        )
+
+
+def push_recipe_card(recipe_id):
+    """Swap a finished job's card for its recipe card on connected clients."""
+    if turbo.can_push():
+        if db.session.scalar(_RECENT_RECIPE_COUNT) > RECENT_RECIPES_LIMIT:
+            # The oldest listed recipe has to drop off as well; refresh them all
+            push_results_area()
+            return
+
+        recipe = (
+            db.session.query(Recipe)
+            .options(
+                selectinload(Recipe.ingredients),
+                selectinload(Recipe.instructions),
+                joinedload(Recipe.transcription_job),
+            )
+            .filter(Recipe.id == recipe_id)
+            .one()
+        )
+        turbo.push(
+            [
+                turbo.replace(
+                    render_template(
+                        "components/recipe_card.html",
+                        recipe=recipe,
+                        job=recipe.transcription_job,
+                    ),
+                    target=f"recipe-{recipe.external_recipe_id}",
+                ),
+                # Only present before the first recipe; removing it is
+                # otherwise a no-op on the client
+                turbo.remove(target="empty-placeholder"),
+            ]
+        )
+
+
+def insert_recipe_children(recipe_id, data):
+    """Insert a recipe's ingredients and instructions with one executemany each."""
+    ingredients = [
+        {
+            "recipe_id": recipe_id,
+            "item": i["item"],
+            "quantity": i["quantity"],
+            "unit": i["unit"],
+            "order": index,
+        }
+        for index, i in enumerate(data.get("ingredients") or (), 1)
+    ]
+    if ingredients:
+        db.session.execute(insert(Ingredient), ingredients)
+
+    instructions = [
+        {"recipe_id": recipe_id, "step_number": index, "description": instruction}
+        for index, instruction in enumerate(data.get("instructions") or (), 1)
+    ]
+    if instructions:
+        db.session.execute(insert(Instruction), instructions)
+
 
 @bp.route("/update-status", methods=["POST"])
 def update_status():
@@ -17,28 +114,36 @@ def update_status():
     status: str | None = request.form.get("status") or None
     message: str | None = request.form.get("message") or None
 
-    job = (
-        db.session.query(TranscriptionJob)
-        .filter(TranscriptionJob.external_recipe_id == external_recipe_id)
-        .one_or_none()
+    values = {"status": status, "last_status": message}
+
+    # If status is failed, store error message and mark as completed
+    if status == "failed":
+        values["error_message"] = message
+        values["completed_at"] = datetime.now(timezone.utc)
+
+    # Apply the update in one statement, skipping repeats of the status the
+    # job already has so chatty progress updates don't rewrite or re-render
+    result = db.session.execute(
+        update(TranscriptionJob)
+        .where(
+            TranscriptionJob.external_recipe_id == external_recipe_id,
+            or_(
+                TranscriptionJob.status.is_distinct_from(status),
+                TranscriptionJob.last_status.is_distinct_from(message),
+            ),
+        )
+        .values(values)
     )
 
-    if not job:
-        # Job not found - could be a race condition or already deleted
+    if not result.rowcount:
+        # Job not found (a race condition or already deleted) or unchanged.
         # Return 200 to acknowledge webhook (prevent retries) but assume no-op
         return "", 200
 
-    job.status = status  # type: ignore
-    job.last_status = message  # type: ignore
-
-    # If status is failed, store error message and mark as completed
-    if status == "failed":
-        job.error_message = message
-        job.completed_at = datetime.now(timezone.utc)
-
     db.session.commit()
 
-    turbo.push(turbo.replace(recipes(), target="results-area"))
+    # Only this job's card changed; don't re-render the whole results area
+    push_job_card(external_recipe_id)
 
     return "", 200
 
@@ -49,11 +154,9 @@ def record_recipe():
     external_recipe_id = data["external_recipe_id"]
 
     # Check if recipe already exists
-    existing_recipe = (
-        db.session.query(Recipe)
-        .filter_by(external_recipe_id=external_recipe_id)
-        .one_or_none()
-    )
+    existing_recipe = db.session.execute(
+        _RECIPE_BY_EXTERNAL_ID, {"external_recipe_id": external_recipe_id}
+    ).scalar_one_or_none()
 
     if existing_recipe is not None:
         # Update existing recipe (reprocessing case)
@@ -64,23 +167,14 @@ def record_recipe():
         existing_recipe.servings = data["servings"]
         existing_recipe.notes = data["notes"]
 
-        # Clear and update ingredients
-        existing_recipe.ingredients.clear()
-        if "ingredients" in data:
-            existing_recipe.ingredients = [
-                Ingredient(
-                    item=i["item"], quantity=i["quantity"], unit=i["unit"], order=index
-                )
-                for index, i in enumerate(data["ingredients"], 1)
-            ]
-
-        # Clear and update instructions
-        existing_recipe.instructions.clear()
-        if "instructions" in data:
-            existing_recipe.instructions = [
-                Instruction(step_number=index, description=instruction)
-                for index, instruction in enumerate(data["instructions"], 1)
-            ]
+        # Clear the old ingredients and instructions with one DELETE each
+        # instead of loading them; replacements are inserted below
+        db.session.query(Ingredient).filter(
+            Ingredient.recipe_id == existing_recipe.id
+        ).delete(synchronize_session=False)
+        db.session.query(Instruction).filter(
+            Instruction.recipe_id == existing_recipe.id
+        ).delete(synchronize_session=False)
 
         recipe = existing_recipe
     else:
@@ -95,35 +189,30 @@ def record_recipe():
             notes=data["notes"],
         )
 
-        if "ingredients" in data:
-            recipe.ingredients = [
-                Ingredient(
-                    item=i["item"], quantity=i["quantity"], unit=i["unit"], order=index
-                )
-                for index, i in enumerate(data["ingredients"], 1)
-            ]
-
-        if "instructions" in data:
-            recipe.instructions = [
-                Instruction(step_number=index, description=instruction)
-                for index, instruction in enumerate(data["instructions"], 1)
-            ]
-
         db.session.add(recipe)
 
+    # Flush so a new recipe has an id, then insert the children in bulk rather
+    # than one ORM INSERT per row
+    db.session.flush()
+    insert_recipe_children(recipe.id, data)
+
     # Update the transcription job
-    job = (
-        db.session.query(TranscriptionJob)
-        .filter_by(external_recipe_id=external_recipe_id)
-        .one_or_none()
-    )
+    job = db.session.execute(
+        _JOB_BY_EXTERNAL_ID, {"external_recipe_id": external_recipe_id}
+    ).scalar_one_or_none()
 
     if job is not None:
         job.status = "completed"
         job.completed_at = datetime.now(timezone.utc)
 
+    recipe_id = recipe.id
     db.session.commit()
 
-    turbo.push(turbo.replace(recipes(), target="results-area"))
+    if existing_recipe is None:
+        # The job card and the new recipe share a frame id; replace it in place
+        push_recipe_card(recipe_id)
+    else:
+        # A reprocessed recipe's old card is also on the page; refresh them all
+        push_results_area()
 
     return "", 200
@@ -1,15 +1,46 @@
-import json
+import copy
+import hashlib
 import logging
 import os
 import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Optional
 
-from ollama import Client, ResponseError
 from pydantic import BaseModel, Field, ValidationError
+from pydantic_core import from_json
 
 logger = logging.getLogger(__name__)
 
+_FENCE_RE = re.compile(r"```json\s*(\{[\s\S]*?\})\s*```", re.IGNORECASE)
+
+# Read once; worker environment does not change after startup
+_SKIP_OLLAMA = os.environ.get("SKIP_OLLAMA") == "1"
+
+# Returned instead of calling Ollama when SKIP_OLLAMA=1; treat as read-only
+MOCK_RECIPE = {
+    "title": "Test Recipe - Mock Data",
+    "prep_time": "15 minutes",
+    "cook_time": "30 minutes",
+    "servings": "4",
+    "notes": "This is mock data for testing. Set SKIP_OLLAMA=0 to use real Ollama.",
+    "ingredients": [
+        {"quantity": "2", "unit": "cups", "item": "flour"},
+        {"quantity": "1", "unit": "cup", "item": "sugar"},
+        {"quantity": "3", "unit": None, "item": "eggs"},
+    ],
+    "instructions": [
+        "Preheat oven to 350°F",
+        "Mix dry ingredients together",
+        "Add wet ingredients and stir",
+        "Pour into baking pan",
+        "Bake for 30 minutes until golden",
+    ],
+}
+
+# Structured results kept per worker, so reprocessing identical text skips pass 2
+_STRUCTURED_CACHE_SIZE = 128
+
 
 class IngredientSchema(BaseModel):
     """Schema for individual ingredient in recipe."""
@@ -47,6 +78,10 @@ class RecipeSchema(BaseModel):
     )
 
 
+# Built once at import; passed as the structured-output format on every request
+_RECIPE_JSON_SCHEMA = RecipeSchema.model_json_schema()
+
+
 class OllamaService:
     """Service for transcribing recipes from images using Ollama vision models.
 
@@ -57,19 +92,34 @@ class OllamaService:
 
     def __init__(self):
         self.host = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
-        self.client = Client(host=self.host)
+        self._client = None
+        self._structured_cache = OrderedDict()
         self.model = None
 
+    @property
+    def client(self):
+        """Ollama client, created on first use to keep worker imports light."""
+        if self._client is None:
+            # ollama pulls in httpx and friends; mock-mode workers never need it
+            from ollama import Client
+
+            self._client = Client(host=self.host)
+        return self._client
+
     def _get_config(self):
         """Load configuration from environment variables (works in Celery workers)."""
         if not self.model:
             self.model = os.environ.get("OLLAMA_MODEL", "qwen3-vl")
             self.structure_model = os.environ.get("STRUCTURE_MODEL") or self.model
+            # Structure models named "*vision*" are called without the schema format
+            self.use_format_param = "vision" not in self.structure_model
             logger.info(
                 f"[CONFIG] Vision model: {self.model} | Structure model: {self.structure_model} | Host: {self.host}"
             )
 
-    def transcribe_recipe(self, image_path: str, status_callback=None) -> dict:
+    def transcribe_recipe(
+        self, image_path: str, status_callback=None, use_cache: bool = True
+    ) -> dict:
         """
         Transcribe a recipe from an image using Ollama vision model.
 
@@ -80,6 +130,8 @@ class OllamaService:
         Args:
             image_path: Path to the recipe image file
             status_callback: Optional function to call with status updates (message: str)
+            use_cache: Reuse the structured recipe for previously seen text; when
+                False the text is structured again and replaces the cached result
 
         Returns:
             Dictionary with keys: title, ingredients, instructions, prep_time, cook_time, servings, notes
@@ -88,27 +140,11 @@ class OllamaService:
             Exception: If Ollama service fails or model not found
         """
         # Skip Ollama and return mock data if in testing mode
-        if os.environ.get("SKIP_OLLAMA") == "1":
+        if _SKIP_OLLAMA:
             logger.info("[MOCK MODE] Returning test recipe data")
-            return {
-                "title": "Test Recipe - Mock Data",
-                "prep_time": "15 minutes",
-                "cook_time": "30 minutes",
-                "servings": "4",
-                "notes": "This is mock data for testing. Set SKIP_OLLAMA=0 to use real Ollama.",
-                "ingredients": [
-                    {"quantity": "2", "unit": "cups", "item": "flour"},
-                    {"quantity": "1", "unit": "cup", "item": "sugar"},
-                    {"quantity": "3", "unit": None, "item": "eggs"},
-                ],
-                "instructions": [
-                    "Preheat oven to 350°F",
-                    "Mix dry ingredients together",
-                    "Add wet ingredients and stir",
-                    "Pour into baking pan",
-                    "Bake for 30 minutes until golden",
-                ],
-            }
+            return MOCK_RECIPE
+
+        from ollama import ResponseError
 
         self._get_config()
 
@@ -119,9 +155,11 @@ class OllamaService:
             logger.info(message)
 
         try:
-            # Verify image file exists
+            # Read the image once up front; this doubles as the existence check
             image_file = Path(image_path)
-            if not image_file.exists():
+            try:
+                image_bytes = image_file.read_bytes()
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Image file not found: {image_path}")
 
             # Pre-flight check: ensure Ollama is reachable before doing heavy work
@@ -145,7 +183,7 @@ IMPORTANT: Be thorough and precise. Read every word carefully multiple times if
 Extract EVERY piece of visible text exactly as you see it. Return only the complete text transcription, nothing else."""
 
             logger.info(f"\n{'='*70}")
-            logger.info(f"[PASS 1] TEXT EXTRACTION from {Path(image_path).name}")
+            logger.info(f"[PASS 1] TEXT EXTRACTION from {image_file.name}")
             logger.info(f"Vision model: {self.model}")
             logger.info(f"Calling Ollama...")
 
@@ -157,7 +195,8 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
                     {
                         "role": "user",
                         "content": extraction_prompt,
-                        "images": [str(image_file)],
+                        # Raw bytes skip the client's path probing and re-read
+                        "images": [image_bytes],
                     }
                 ],
                 stream=False,
@@ -172,20 +211,18 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
             )
 
             extracted_text = response1.message.content
-            if (
-                not extracted_text
-                and hasattr(response1.message, "thinking")
-                and response1.message.thinking
-            ):
+            thinking = getattr(response1.message, "thinking", None)
+            if not extracted_text and thinking:
                 logger.info("[PASS 1] Using thinking field from model response")
-                extracted_text = response1.message.thinking
+                extracted_text = thinking
 
             logger.info(
                 f"[PASS 1] ✓ Extracted {len(extracted_text) if extracted_text else 0} characters"
             )
             if extracted_text:
-                logger.info(f"[PASS 1] Preview: {extracted_text[:150]}...")
-                logger.info("[PASS 1] Full extraction follows:\n%s", extracted_text)
+                logger.info("[PASS 1] Preview: %s...", extracted_text[:150])
+                # The full text can run to several KB; keep it out of info logs
+                logger.debug("[PASS 1] Full extraction follows:\n%s", extracted_text)
 
             if not extracted_text or not extracted_text.strip():
                 logger.error("❌ Empty text extracted from image in first pass")
@@ -194,16 +231,21 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
                     "Failed to extract text from image - empty response from Ollama"
                 )
 
-            # SECOND PASS: Structure the extracted text into recipe format (strict JSON)
-            logger.info(f"\n{'='*70}")
-            logger.info(f"[PASS 2] RECIPE STRUCTURING to JSON")
-            logger.info(f"Structure model: {self.structure_model}")
-            logger.info(f"Extracted text: {len(extracted_text)} chars")
-            logger.info(f"Calling Ollama for JSON conversion...")
+            # Pass 1 sometimes answers with the recipe as JSON already; skip pass 2
+            result = self._recipe_from_text(extracted_text)
+            if result is not None:
+                logger.info("[PASS 2] Skipped: pass 1 output is already a valid recipe")
+            else:
+                # SECOND PASS: Structure the extracted text into recipe format (strict JSON)
+                logger.info(f"\n{'='*70}")
+                logger.info(f"[PASS 2] RECIPE STRUCTURING to JSON")
+                logger.info(f"Structure model: {self.structure_model}")
+                logger.info(f"Extracted text: {len(extracted_text)} chars")
+                logger.info(f"Calling Ollama for JSON conversion...")
 
-            update_status(f"Text extracted! Now organizing into recipe format...")
+                update_status(f"Text extracted! Now organizing into recipe format...")
 
-            result = self._structure_text_to_recipe(extracted_text)
+                result = self._structure_text_cached(extracted_text, use_cache)
 
             logger.info(f"\n{'='*70}")
             logger.info(f"✓✓✓ SUCCESS ✓✓✓")
@@ -246,6 +288,24 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
             logger.error(f"❌ Unexpected error in transcribe_recipe: {e}")
             raise
 
+    def _structure_text_cached(
+        self, extracted_text: str, use_cache: bool = True
+    ) -> dict:
+        """Structure extracted text, reusing the result for text seen before."""
+        key = hashlib.blake2b(extracted_text.encode(), digest_size=16).digest()
+        cached = self._structured_cache.get(key) if use_cache else None
+        if cached is not None:
+            self._structured_cache.move_to_end(key)
+            logger.info("  ✓ Reusing structured recipe for identical extracted text")
+            return copy.deepcopy(cached)
+
+        result = self._structure_text_to_recipe(extracted_text)
+        self._structured_cache[key] = copy.deepcopy(result)
+        self._structured_cache.move_to_end(key)
+        if len(self._structured_cache) > _STRUCTURED_CACHE_SIZE:
+            self._structured_cache.popitem(last=False)
+        return result
+
     def _structure_text_to_recipe(self, extracted_text: str) -> dict:
         """Structure extracted text into a recipe using strict schema and retries."""
         # Direct instructions for structuring
@@ -272,9 +332,6 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
             "num_predict": 2048,
         }
 
-        schema_format = RecipeSchema.model_json_schema()
-        use_format_param = "vision" not in (self.structure_model or "")
-
         # Try up to 2 corrective retries if the model emits prose or invalid JSON
         last_response_text = ""
         for attempt in range(3):  # initial + 2 retries
@@ -292,7 +349,7 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
                     model=self.structure_model,
                     messages=messages,
                     stream=False,
-                    format=schema_format if use_format_param else None,
+                    format=_RECIPE_JSON_SCHEMA if self.use_format_param else None,
                     options=options,
                 )
 
@@ -300,57 +357,48 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
                 response_text = response.message.content
 
                 # If content is empty, check thinking field
-                if (
-                    not response_text
-                    and hasattr(response.message, "thinking")
-                    and response.message.thinking
-                ):
+                thinking = getattr(response.message, "thinking", None)
+                if not response_text and thinking:
                     logger.info(f"    [DEBUG] Content empty, using thinking field")
-                    response_text = response.message.thinking
+                    response_text = thinking
 
-                # Log full response structure for debugging if empty
+                # Dump the full response structure only when debugging
                 if not response_text:
-                    logger.warning(
-                        f"    [DEBUG] Empty response. Message fields: {dir(response.message)}"
-                    )
-                    logger.warning(
-                        f"    [DEBUG] Message dict: {response.message.__dict__}"
-                    )
+                    logger.warning("    Empty response from structuring model")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            f"    [DEBUG] Message fields: {dir(response.message)}"
+                        )
+                        logger.debug(
+                            f"    [DEBUG] Message dict: {response.message.__dict__}"
+                        )
 
                 last_response_text = response_text
                 logger.info(f"    ✓ Response received: {len(response_text)} chars")
 
-                recipe_json = json.loads(response_text)
-                logger.info(f"    ✓ Valid JSON parsed")
-
-                recipe_data = RecipeSchema(**recipe_json)
-                logger.info(f"    ✓ Schema validation passed")
+                # Parse and validate in one pass inside pydantic-core
+                recipe_data = RecipeSchema.model_validate_json(response_text)
+                logger.info(f"    ✓ Valid JSON parsed and schema validation passed")
                 logger.info(
                     f"  ✓✓ SUCCESS on attempt {attempt + 1}: '{recipe_data.title}'"
                 )
                 return recipe_data.model_dump()
-            except (json.JSONDecodeError, ValidationError) as e:
+            except ValidationError as e:
                 logger.warning(
                     f"    ❌ Attempt {attempt + 1} failed: {type(e).__name__}"
                 )
                 logger.warning(
                     f"       Response text (first 200 chars): '{response_text[:200] if response_text else '[EMPTY]'}'"
                 )
-                if isinstance(e, json.JSONDecodeError):
-                    logger.debug(f"       JSON error: {e.msg} at position {e.pos}")
-                else:
-                    logger.debug(f"       Validation: {str(e)[:150]}")
-                # Prepare corrective follow-up message and retry
-                corrective = (
-                    "Your last answer was not a single JSON object matching the schema. "
-                    "Reply with ONLY the JSON object. No prose, no markdown, no code fences. "
-                    "Use null for missing fields."
-                )
-                messages = [
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": user_msg},
-                    {"role": "user", "content": corrective},
-                ]
+                logger.debug(f"       Validation: {str(e)[:150]}")
+                # Add the corrective follow-up once; later retries resend the same turns
+                if len(messages) == 2:
+                    corrective = (
+                        "Your last answer was not a single JSON object matching the schema. "
+                        "Reply with ONLY the JSON object. No prose, no markdown, no code fences. "
+                        "Use null for missing fields."
+                    )
+                    messages.append({"role": "user", "content": corrective})
                 continue
 
         # Final fallback: try to extract JSON block from the last response
@@ -359,7 +407,7 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
         if extracted is not None:
             logger.info(f"    ✓ Found JSON block in response")
             try:
-                recipe_data = RecipeSchema(**extracted)
+                recipe_data = RecipeSchema.model_validate(extracted)
                 logger.info(
                     f"  ✓✓ Defensive extraction succeeded: '{recipe_data.title}'"
                 )
@@ -371,34 +419,76 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
         logger.error(f"Last response: {last_response_text[:300]}...")
         raise Exception("Failed to obtain schema-compliant JSON from structuring pass")
 
+    def _recipe_from_text(self, text: str) -> Optional[dict]:
+        """Return a validated recipe if the text already contains one, else None."""
+        candidate = self._extract_json_from_text(text)
+        if candidate is None:
+            return None
+        try:
+            recipe = RecipeSchema.model_validate(candidate)
+        except ValidationError:
+            return None
+        # A bare title (or a stray object that happens to have one) isn't a
+        # recipe yet; let pass 2 structure the full text instead
+        if not (recipe.ingredients or recipe.instructions):
+            return None
+        return recipe.model_dump()
+
+    @staticmethod
+    def _object_end(text: str, start: int) -> Optional[int]:
+        """Return the index just past the "}" closing the "{" at start, if any."""
+        depth = 0
+        in_string = False
+        escape = False
+        for pos in range(start, len(text)):
+            char = text[pos]
+            if in_string:
+                if escape:
+                    escape = False
+                elif char == "\\":
+                    escape = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+        return None
+
     def _extract_json_from_text(self, text: str) -> Optional[dict]:
         """Extract first valid JSON object from text, handling various formats."""
         if not text:
             return None
 
         # Try fenced ```json blocks first
-        fence = re.search(r"```json\s*(\{[\s\S]*?\})\s*```", text, re.IGNORECASE)
+        fence = _FENCE_RE.search(text)
         if fence:
             try:
-                return json.loads(fence.group(1))
-            except json.JSONDecodeError:
+                return from_json(fence.group(1))
+            except ValueError:
                 pass
 
-        # Try to find valid JSON by looking for { and finding matching }
-        # Start from each { and expand outward until valid JSON is found
-        brace_starts = [m.start() for m in re.finditer(r"\{", text)]
-        for start_pos in brace_starts:
-            # Try increasingly longer substrings
-            for end_pos in range(len(text), start_pos, -1):
-                candidate = text[start_pos:end_pos]
+        # Try each balanced {...} group in turn, skipping braces inside string
+        # literals. A group that doesn't parse (prose such as "{about 2 cups}",
+        # or an unclosed brace) may still contain the object, so the scan
+        # restarts from the next "{" after the failed one.
+        start = text.find("{")
+        while start != -1:
+            end = self._object_end(text, start)
+            if end is not None:
                 try:
-                    result = json.loads(candidate)
+                    result = from_json(text[start:end])
                     logger.debug(
-                        f"Successfully extracted JSON from position {start_pos}:{end_pos}"
+                        f"Successfully extracted JSON from position {start}:{end}"
                     )
                     return result
-                except json.JSONDecodeError:
-                    continue
+                except ValueError:
+                    pass
+            start = text.find("{", start + 1)
 
         return None
 
@@ -408,6 +498,8 @@ Extract EVERY piece of visible text exactly as you see it. Return only the compl
         Returns:
             True if service and model are available, False otherwise
         """
+        from ollama import ResponseError
+
         self._get_config()
         try:
             logger.info(f"Testing Ollama connection...")
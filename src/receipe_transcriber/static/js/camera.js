@@ -40,13 +40,12 @@ window.camera = {
     canvas.toBlob(async (blob) => {
       this.close()
       
-      const formData = new FormData()
-      formData.append('images', blob, 'camera-capture.jpg')
-      
       try {
-        const response = await fetch('/upload', {
-          method: 'POST',
-          body: formData
+        // Send the JPEG as the raw body; the server streams it straight to disk
+        const response = await fetch('/upload/camera-capture.jpg', {
+          method: 'PUT',
+          headers: { 'Content-Type': 'image/jpeg' },
+          body: blob
         })
         
         if (response.ok) {
@@ -1,18 +1,68 @@
+import hashlib
+import json
 import logging
 import os
-import random
 import time
+from functools import partial
+from pathlib import Path
 
+import redis
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from receipe_transcriber.celery_app import celery
-from receipe_transcriber.services.ollama_service import ollama_service
+from receipe_transcriber.services.ollama_service import MOCK_RECIPE, ollama_service
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive pool so webhook posts reuse connections across tasks.
+# Both webhooks tolerate replays (repeated statuses are skipped, a re-posted
+# recipe replaces the saved one), so transient gateway errors are retried.
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Worker environment is fixed at startup, so read the mock switches once
+_SKIP_OLLAMA = os.getenv("SKIP_OLLAMA") == "1"
+# Optional pause (seconds) in mock mode, e.g. to watch the job card states
+_MOCK_DELAY = float(os.getenv("MOCK_DELAY", "0"))
+
+# Transcriptions cached by image content, so duplicate uploads skip Ollama.
+# The cache is optional, so an unreachable Redis fails fast instead of
+# stalling the task on the default (unbounded) socket timeouts.
+_redis = redis.Redis.from_url(
+    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+    socket_timeout=2,
+    socket_connect_timeout=1,
+)
+_RESULT_CACHE_TTL = 24 * 60 * 60
+
+
+def _image_cache_key(image_path):
+    """Cache key from the image bytes and the models that would read them."""
+    with open(image_path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256")
+    ollama_service._get_config()
+    return (
+        f"transcription:{ollama_service.model}:{ollama_service.structure_model}:"
+        f"{digest.hexdigest()}"
+    )
+
 
-def get_recipe_data(image_path, status_callback=None):
+def get_recipe_data(image_path, status_callback=None, use_cache=True):
     """
     Fetch recipe data from Ollama or return mock data if testing.
     Set SKIP_OLLAMA=1 env var to use mock data for faster iteration.
@@ -20,37 +70,76 @@ def get_recipe_data(image_path, status_callback=None):
     Args:
         image_path: Path to the recipe image
         status_callback: Optional callback function for status updates
+        use_cache: Return a cached transcription of identical image bytes if
+            any. When False the image is read afresh and the new result
+            replaces the cached one.
     """
-    if os.getenv("SKIP_OLLAMA") == "1":
+    if _SKIP_OLLAMA:
         # Return mock recipe data for testing
-        return {
-            "title": "Test Recipe - Mock Data",
-            "prep_time": "15 minutes",
-            "cook_time": "30 minutes",
-            "servings": "4",
-            "notes": "This is mock data for testing. Set SKIP_OLLAMA=0 to use real Ollama.",
-            "ingredients": [
-                {"quantity": "2", "unit": "cups", "item": "flour"},
-                {"quantity": "1", "unit": "cup", "item": "sugar"},
-                {"quantity": "3", "unit": None, "item": "eggs"},
-            ],
-            "instructions": [
-                "Preheat oven to 350°F",
-                "Mix dry ingredients together",
-                "Add wet ingredients and stir",
-                "Pour into baking pan",
-                "Bake for 30 minutes until golden",
-            ],
-        }
+        return MOCK_RECIPE
+
+    cache_key = None
+    # A missing image is left for the service to report
+    if os.path.exists(image_path):
+        cache_key = _image_cache_key(image_path)
+    if use_cache and cache_key is not None:
+        try:
+            cached = _redis.get(cache_key)
+        except redis.RedisError as e:
+            logger.warning("Transcription cache unavailable: %s", e)
+            cached = None
+        if cached is not None:
+            logger.info("Using cached transcription for %s", image_path)
+            return json.loads(cached)
 
     # Real Ollama call
-    return ollama_service.transcribe_recipe(image_path, status_callback=status_callback)
+    recipe_data = ollama_service.transcribe_recipe(
+        image_path, status_callback=status_callback, use_cache=use_cache
+    )
+
+    if cache_key is not None:
+        try:
+            _redis.setex(cache_key, _RESULT_CACHE_TTL, json.dumps(recipe_data))
+        except redis.RedisError as e:
+            logger.warning("Could not cache transcription: %s", e)
+
+    return recipe_data
+
 
+def _join_list(value, separator):
+    """Join a list-valued field into one string, dropping empty entries."""
+    if isinstance(value, list):
+        return separator.join(map(str, filter(None, value)))
+    return value
 
-def publish_status(external_recipe_id, status, message, status_update_hook):
+
+def normalize_recipe_data(recipe_data):
+    """
+    Coerce model output into the string/list shapes the recipe webhook expects.
+
+    Args:
+        recipe_data: Recipe dict from Ollama or the mock data
+    """
+    servings = recipe_data.get("servings")
+
+    if servings and not isinstance(servings, str):
+        servings = str(servings)
+
+    return {
+        "title": recipe_data.get("title", "Untitled Recipe"),
+        "prep_time": recipe_data.get("prep_time"),
+        "cook_time": _join_list(recipe_data.get("cook_time"), ", "),
+        "servings": servings,
+        "ingredients": recipe_data.get("ingredients", []),
+        "instructions": recipe_data.get("instructions", []),
+        "notes": _join_list(recipe_data.get("notes"), "\n"),
+    }
+
+
+def publish_status(external_recipe_id, status_update_hook, status, message):
     try:
-        logger.info(f"Publishing status: {status} - {message}")
-        response = requests.post(
+        logger.info("Publishing status: %s - %s", status, message)
+        response = _session.post(
             status_update_hook,
             data={
                 "external_recipe_id": external_recipe_id,
@@ -60,13 +149,14 @@ def publish_status(external_recipe_id, status, message, status_update_hook):
             timeout=10,
         )
         response.raise_for_status()
-        logger.info(f"Status published successfully to {status_update_hook}")
+        logger.info("Status published successfully to %s", status_update_hook)
     except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to publish status to {status_update_hook}: {e}")
+        logger.error("Failed to publish status to %s: %s", status_update_hook, e)
         # Don't raise - allow task to continue even if status update fails
 
 
-@celery.task(bind=True)
+# Results are delivered through the webhooks, so skip the result backend write
+@celery.task(bind=True, ignore_result=True)
 def transcribe_recipe_task(
     _,
     image_path,
@@ -75,8 +165,6 @@ def transcribe_recipe_task(
     external_recipe_id,
     is_reprocessing=False,
 ):
-    is_mock = os.getenv("SKIP_OLLAMA") == "1"
-
     # Use appropriate status message for initial state
     initial_message = (
         "Reprocessing your recipe..."
@@ -84,106 +172,64 @@ def transcribe_recipe_task(
         else "Starting transcription..."
     )
 
-    publish_status(
-        external_recipe_id,
-        "processing",
-        initial_message,
-        status_update_hook,
-    )
+    # Job id and hook are fixed for the task; bind them once
+    publish = partial(publish_status, external_recipe_id, status_update_hook)
+
+    publish("processing", initial_message)
 
     try:
-        if is_mock:
-            time.sleep(random.uniform(1, 10))
+        if _SKIP_OLLAMA and _MOCK_DELAY:
+            time.sleep(_MOCK_DELAY)
 
         # Create a status update callback
-        def status_update(message):
-            publish_status(
-                external_recipe_id,
-                "processing",
-                message,
-                status_update_hook,
-            )
-
-        recipe_data = get_recipe_data(image_path, status_callback=status_update)
-
-        # Extract data from processed recipe image.
-        cook_time = recipe_data.get("cook_time")
-
-        if isinstance(cook_time, list):
-            cook_time = ", ".join(str(t) for t in cook_time if t)
-
-        notes = recipe_data.get("notes")
-
-        if isinstance(notes, list):
-            notes = "\n".join(str(n) for n in notes if n)
-
-        servings = recipe_data.get("servings")
-
-        if servings and not isinstance(servings, str):
-            servings = str(servings)
+        status_update = partial(publish, "processing")
 
-        title = recipe_data.get("title", "Untitled Recipe")
-        prep_time = recipe_data.get("prep_time")
-        instructions = recipe_data.get("instructions", [])
-        ingredients = recipe_data.get("ingredients", [])
+        # Reprocessing asks for a fresh read, which then replaces the cached one
+        recipe_data = get_recipe_data(
+            image_path, status_callback=status_update, use_cache=not is_reprocessing
+        )
 
         transcribed_recipe = {
             "external_recipe_id": external_recipe_id,
             "image_path": image_path,
-            "title": title,
-            "prep_time": prep_time,
-            "cook_time": cook_time,
-            "servings": servings,
-            "ingredients": ingredients,
-            "instructions": instructions,
-            "notes": notes,
+            **normalize_recipe_data(recipe_data),
         }
 
-        # Final status update before saving
-        publish_status(
-            external_recipe_id,
-            "processing",
-            f"Recipe '{title}' complete! Saving...",
-            status_update_hook,
-        )
-
+        # No separate "Saving..." status: the completion hook replaces the job
+        # card with the recipe card straight away
         try:
-            logger.info(f"Posting recipe data to {processing_complete_hook}")
-            response = requests.post(
+            logger.info("Posting recipe data to %s", processing_complete_hook)
+            response = _session.post(
                 processing_complete_hook, json=transcribed_recipe, timeout=10
             )
             response.raise_for_status()
             logger.info(
-                f"Recipe data posted successfully, status: {response.status_code}"
+                "Recipe data posted successfully, status: %s", response.status_code
             )
         except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to post recipe data to webhook: {e}")
+            logger.error("Failed to post recipe data to webhook: %s", e)
             # Still publish failure status to update UI
-            publish_status(
-                external_recipe_id,
-                "failed",
-                f"Failed to save recipe: {str(e)}",
-                status_update_hook,
-            )
+            publish("failed", f"Failed to save recipe: {str(e)}")
             raise
 
         return transcribed_recipe
     except Exception as e:
         # Log error and publish failed status
         error_message = str(e)
-        logger.error(f"Task failed for {external_recipe_id}: {error_message}")
+        logger.error("Task failed for %s: %s", external_recipe_id, error_message)
 
         # Publish failure status to update UI (truncate error if too long)
         display_error = (
             (error_message[:200] + "...") if len(error_message) > 200 else error_message
         )
 
-        publish_status(
-            external_recipe_id,
-            "failed",
-            f"Processing failed: {display_error}",
-            status_update_hook,
-        )
+        publish("failed", f"Processing failed: {display_error}")
 
         # Re-raise the exception so Celery knows the task failed
         raise
+
+
+@celery.task(ignore_result=True)
+def delete_image_file(image_path):
+    """Remove an uploaded image off the request path."""
+    Path(image_path).unlink(missing_ok=True)
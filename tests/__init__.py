@@ -0,0 +1,21 @@
+import tempfile
+
+from sqlalchemy.pool import StaticPool
+
+from receipe_transcriber.config import Config
+
+
+class TestingConfig(Config):
+    TESTING = True
+    # One shared in-memory connection per app: no database file to create/drop
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "poolclass": StaticPool,
+        "connect_args": {"check_same_thread": False},
+    }
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+
+class UploadTestingConfig(TestingConfig):
+    # Private per process so parallel test workers don't share uploads
+    UPLOAD_FOLDER = tempfile.mkdtemp(prefix="rt_uploads_")
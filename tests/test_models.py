@@ -1,23 +1,18 @@
-import os
-import tempfile
 import unittest
 
 from receipe_transcriber import create_app, db
-from receipe_transcriber.config import Config
 from receipe_transcriber.models import Ingredient, Instruction, Recipe
 
-
-class TestingConfig(Config):
-    TESTING = True
-    SQLALCHEMY_DATABASE_URI = "sqlite:///%s" % os.path.join(
-        tempfile.gettempdir(), "rt_models_test.db"
-    )
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
+from . import TestingConfig
 
 
 class ModelsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Build the app once; each test still gets fresh tables
+        cls.app = create_app(TestingConfig)
+
     def setUp(self):
-        self.app = create_app(TestingConfig)
         with self.app.app_context():
             db.create_all()
 
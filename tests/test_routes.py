@@ -1,27 +1,32 @@
 import io
 import os
-import tempfile
+import shutil
 import unittest
 from unittest.mock import patch
 
 from receipe_transcriber import create_app, db
-from receipe_transcriber.config import Config
-from receipe_transcriber.models import Recipe, TranscriptionJob
+from receipe_transcriber.models import (
+    Ingredient,
+    Instruction,
+    Recipe,
+    TranscriptionJob,
+)
 
-
-class TestingConfig(Config):
-    TESTING = True
-    SQLALCHEMY_DATABASE_URI = "sqlite:///%s" % os.path.join(
-        tempfile.gettempdir(), "rt_test.db"
-    )
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-    UPLOAD_FOLDER = os.path.join(tempfile.gettempdir(), "rt_uploads")
+from . import UploadTestingConfig
 
 
 class RoutesTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Build the app once; each test still gets fresh tables.
+        # create_app also creates UPLOAD_FOLDER, which tearDown only empties.
+        cls.app = create_app(UploadTestingConfig)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.app.config["UPLOAD_FOLDER"], ignore_errors=True)
+
     def setUp(self):
-        self.app = create_app(TestingConfig)
-        os.makedirs(self.app.config["UPLOAD_FOLDER"], exist_ok=True)
         self.client = self.app.test_client()
         with self.app.app_context():
             db.create_all()
@@ -48,6 +53,11 @@ class RoutesTestCase(unittest.TestCase):
             self.assertTrue(allowed_file("image.webp"))
             self.assertFalse(allowed_file("image.gif"))
             self.assertFalse(allowed_file("image"))
+            # Only the last extension counts, case-insensitively
+            self.assertTrue(allowed_file("IMAGE.JPG"))
+            self.assertTrue(allowed_file("archive.tar.png"))
+            self.assertFalse(allowed_file("image.png.exe"))
+            self.assertIsInstance(self.app.config["ALLOWED_EXTENSIONS"], frozenset)
 
     def test_upload_invalid(self):
         resp = self.client.post("/upload")
@@ -61,13 +71,87 @@ class RoutesTestCase(unittest.TestCase):
         )
         self.assertEqual(resp.status_code, 302)
         self.assertTrue(mock_async.called)
+        args = mock_async.call_args[1]["args"]
+        self.assertEqual(args[1], "http://localhost/update-status")
+        self.assertEqual(args[2], "http://localhost/record-recipe")
         with self.app.app_context():
             jobs = db.session.query(TranscriptionJob).all()
             self.assertEqual(len(jobs), 1)
             self.assertEqual(jobs[0].status, "pending")
             self.assertTrue(os.path.exists(jobs[0].image_path))
+            self.assertEqual(
+                os.path.basename(jobs[0].image_path),
+                f"{jobs[0].external_recipe_id}_test.jpg",
+            )
 
-    def test_delete_recipe_removes_file_and_record(self):
+    @patch("receipe_transcriber.routes.main.transcribe_recipe_task.apply_async")
+    def test_upload_multiple_files_starts_job_per_file(self, mock_async):
+        data = {
+            "images": [
+                (io.BytesIO(b"fakejpg1"), "one.jpg"),
+                (io.BytesIO(b"fakejpg2"), "two.png"),
+            ]
+        }
+        resp = self.client.post(
+            "/upload", data=data, content_type="multipart/form-data"
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(mock_async.call_count, 2)
+        with self.app.app_context():
+            jobs = db.session.query(TranscriptionJob).all()
+            self.assertEqual(len(jobs), 2)
+            queued_ids = {c[1]["args"][3] for c in mock_async.call_args_list}
+            self.assertEqual(queued_ids, {j.external_recipe_id for j in jobs})
+
+    @patch("receipe_transcriber.routes.main.turbo")
+    @patch("receipe_transcriber.routes.main.transcribe_recipe_task.apply_async")
+    def test_upload_pushes_new_job_cards_to_other_clients(self, mock_async, mock_turbo):
+        mock_turbo.can_push.return_value = True
+        data = {"images": (io.BytesIO(b"fakejpg"), "test.jpg")}
+        self.client.post("/upload", data=data, content_type="multipart/form-data")
+
+        args, kwargs = mock_turbo.prepend.call_args
+        self.assertEqual(kwargs, {"target": "results-area"})
+        external_recipe_id = mock_async.call_args[1]["args"][3]
+        self.assertIn(f'id="recipe-{external_recipe_id}"', args[0])
+        self.assertEqual(
+            mock_turbo.push.call_args[0][0], [mock_turbo.prepend.return_value]
+        )
+
+    @patch("receipe_transcriber.routes.main.transcribe_recipe_task.apply_async")
+    def test_upload_raw_image_streams_body_to_disk(self, mock_async):
+        # Follow redirects like fetch() would; the capture must end in a 2xx
+        resp = self.client.put(
+            "/upload/camera-capture.jpg",
+            data=b"rawjpeg",
+            content_type="image/jpeg",
+            follow_redirects=True,
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(mock_async.call_count, 1)
+        with self.app.app_context():
+            job = db.session.query(TranscriptionJob).one()
+            self.assertTrue(job.image_path.endswith("_camera-capture.jpg"))
+            self.assertIn(f'id="recipe-{job.external_recipe_id}"', resp.text)
+            with open(job.image_path, "rb") as f:
+                self.assertEqual(f.read(), b"rawjpeg")
+
+        resp = self.client.put("/upload/capture.gif", data=b"gif")
+        self.assertEqual(resp.status_code, 400)
+
+    @patch("receipe_transcriber.routes.main.transcribe_recipe_task.apply_async")
+    def test_upload_invalid_file_type_flashes_escaped_name(self, mock_async):
+        data = {"images": (io.BytesIO(b"gif"), "bad<b>.gif")}
+        resp = self.client.post(
+            "/upload", data=data, content_type="multipart/form-data"
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(mock_async.called)
+        body = self.client.get("/recipes").get_data(as_text=True)
+        self.assertIn("Invalid file type: bad&lt;b&gt;.gif", body)
+
+    @patch("receipe_transcriber.routes.main.delete_image_file.delay")
+    def test_delete_recipe_removes_file_and_record(self, mock_delete_image):
         with self.app.app_context():
             image_path = os.path.join(self.app.config["UPLOAD_FOLDER"], "dummy.jpg")
             with open(image_path, "wb") as f:
@@ -80,19 +164,168 @@ class RoutesTestCase(unittest.TestCase):
             recipe = Recipe(
                 external_recipe_id="ext-del", title="To Delete", image_path=image_path
             )
+            recipe.ingredients.append(Ingredient(item="flour"))
+            recipe.instructions.append(Instruction(step_number=1, description="Mix"))
             db.session.add_all([job, recipe])
             db.session.commit()
         with self.app.test_request_context():
             resp = self.client.post("/recipes/ext-del/delete")
             # Turbo push succeeds in test context -> 204
             self.assertIn(resp.status_code, (200, 204, 302))
+            body = resp.get_data(as_text=True)
+            self.assertIn('action="remove" target="recipe-ext-del"', body)
+            self.assertIn('id="empty-placeholder"', body)
         with self.app.app_context():
             self.assertIsNone(
                 db.session.query(Recipe)
                 .filter_by(external_recipe_id="ext-del")
                 .one_or_none()
             )
-        self.assertFalse(os.path.exists(image_path))
+            self.assertEqual(db.session.query(Ingredient).count(), 0)
+            self.assertEqual(db.session.query(Instruction).count(), 0)
+        mock_delete_image.assert_called_once_with(image_path)
+
+    def test_recipes_renders_recent_recipe_with_job(self):
+        from datetime import datetime, timezone
+
+        with self.app.app_context():
+            job = TranscriptionJob(
+                external_recipe_id="ext-recent",
+                session_id="sess",
+                image_path="/tmp/recent.jpg",
+                status="completed",
+            )
+            job.completed_at = datetime(2024, 1, 2, 3, 4, tzinfo=timezone.utc)
+            recipe = Recipe(external_recipe_id="ext-recent", title="Recent Recipe")
+            db.session.add_all([job, recipe])
+            db.session.commit()
+        resp = self.client.get("/recipes")
+        self.assertEqual(resp.status_code, 200)
+        body = resp.get_data(as_text=True)
+        self.assertIn("Recent Recipe", body)
+        self.assertIn("Transcribed: 2024-01-02 03:04 UTC", body)
+
+    def test_recipes_revalidates_unchanged_content_with_304(self):
+        resp = self.client.get("/recipes")
+        self.assertEqual(resp.status_code, 200)
+        etag = resp.headers["ETag"]
+
+        resp = self.client.get("/recipes", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.get_data(), b"")
+
+        with self.app.app_context():
+            db.session.add(
+                TranscriptionJob(
+                    external_recipe_id="ext-etag", session_id="s", image_path="/tmp/e"
+                )
+            )
+            db.session.commit()
+        resp = self.client.get("/recipes", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_recipes_marks_timed_out_processing_job_failed(self):
+        from datetime import datetime, timedelta, timezone
+
+        with self.app.app_context():
+            stale = TranscriptionJob(
+                external_recipe_id="ext-stale",
+                session_id="sess",
+                image_path="/tmp/stale.jpg",
+                status="processing",
+            )
+            stale.created_at = datetime.now(timezone.utc).replace(
+                tzinfo=None
+            ) - timedelta(minutes=30)
+            fresh = TranscriptionJob(
+                external_recipe_id="ext-fresh",
+                session_id="sess",
+                image_path="/tmp/fresh.jpg",
+                status="processing",
+            )
+            db.session.add_all([stale, fresh])
+            db.session.commit()
+
+        resp = self.client.get("/recipes")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("Processing timed out", resp.get_data(as_text=True))
+        with self.app.app_context():
+            statuses = dict(
+                db.session.query(
+                    TranscriptionJob.external_recipe_id, TranscriptionJob.status
+                )
+            )
+        self.assertEqual(statuses, {"ext-stale": "failed", "ext-fresh": "processing"})
+
+    def test_recipes_gallery_loads_ingredients_in_one_query(self):
+        from sqlalchemy import event
+
+        with self.app.app_context():
+            for i in range(3):
+                job = TranscriptionJob(
+                    external_recipe_id=f"ext-gal-{i}",
+                    session_id="sess",
+                    image_path=f"/tmp/gal-{i}.jpg",
+                )
+                recipe = Recipe(external_recipe_id=f"ext-gal-{i}", title=f"Gal {i}")
+                recipe.ingredients.append(Ingredient(item="flour"))
+                db.session.add_all([job, recipe])
+            db.session.commit()
+
+            statements = []
+
+            def count(*args):
+                statements.append(args[2])
+
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                resp = self.client.get("/recipes-gallery")
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("<strong>1</strong> ingredient", resp.get_data(as_text=True))
+        # One query for the recipes and one for all of their ingredients
+        self.assertEqual(len(statements), 2)
+
+    def test_update_recipe_replaces_ingredients_and_instructions(self):
+        with self.app.app_context():
+            job = TranscriptionJob(
+                external_recipe_id="ext-upd", session_id="sess", image_path="/tmp/u"
+            )
+            recipe = Recipe(external_recipe_id="ext-upd", title="Old Title")
+            recipe.ingredients.append(Ingredient(item="old item"))
+            recipe.instructions.append(Instruction(step_number=1, description="old"))
+            db.session.add_all([job, recipe])
+            db.session.commit()
+
+        resp = self.client.post(
+            "/recipes/ext-upd/update",
+            data={
+                "title": "New Title",
+                "ingredients[0][item]": "flour",
+                "ingredients[0][quantity]": "2",
+                "ingredients[0][unit]": "cups",
+                "ingredients[1][item]": "salt",
+                "ingredients[2][item]": "  ",
+                "instructions[0][description]": "Mix",
+                "instructions[1][description]": "Bake",
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("New Title", resp.get_data(as_text=True))
+        with self.app.app_context():
+            recipe = (
+                db.session.query(Recipe).filter_by(external_recipe_id="ext-upd").one()
+            )
+            self.assertEqual(
+                [(i.item, i.quantity, i.unit, i.order) for i in recipe.ingredients],
+                [("flour", "2", "cups", 0), ("salt", None, None, 1)],
+            )
+            self.assertEqual(
+                sorted((i.step_number, i.description) for i in recipe.instructions),
+                [(1, "Mix"), (2, "Bake")],
+            )
 
     @patch("receipe_transcriber.routes.main.transcribe_recipe_task.apply_async")
     def test_reprocess_recipe_starts_job(self, mock_async):
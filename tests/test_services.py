@@ -1,4 +1,8 @@
+import os
+import tempfile
 import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 from receipe_transcriber.services.ollama_service import OllamaService
 
@@ -16,6 +20,115 @@ class ServicesTestCase(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertEqual(result['title'], 'Sample')
 
+    def test_extract_json_from_prose_with_braces(self):
+        svc = OllamaService()
+        text = (
+            'Sure {not json}. Here it is: {"title": "Braces {in} \\"quotes\\"", '
+            '"ingredients": [{"item": "salt"}], "instructions": []} Enjoy!'
+        )
+        result = svc._extract_json_from_text(text)
+        self.assertEqual(result['title'], 'Braces {in} "quotes"')
+        self.assertEqual(result['ingredients'], [{'item': 'salt'}])
+
+    def test_extract_json_restarts_after_unparseable_group(self):
+        svc = OllamaService()
+        for text in (
+            'Use {about 2 cups} of flour. {"title": "Real", "instructions": []}',
+            'Note {unclosed. {"title": "Real", "instructions": []}',
+            '{see card: {"title": "Real", "instructions": []}}',
+        ):
+            with self.subTest(text=text):
+                result = svc._extract_json_from_text(text)
+                self.assertEqual(result, {'title': 'Real', 'instructions': []})
+
+    @patch('receipe_transcriber.services.ollama_service._SKIP_OLLAMA', False)
+    def test_transcribe_skips_structuring_when_pass_one_returns_json(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        image_path = os.path.join(tmp.name, 'svc.jpg')
+        with open(image_path, 'wb') as f:
+            f.write(b'xyz')
+
+        svc = OllamaService()
+        svc._client = MagicMock()
+        svc._client.chat.return_value = SimpleNamespace(
+            message=SimpleNamespace(
+                content='{"title": "Printed Card", "instructions": ["Mix"]}',
+                thinking=None,
+            )
+        )
+
+        result = svc.transcribe_recipe(image_path)
+
+        self.assertEqual(result['title'], 'Printed Card')
+        self.assertEqual(result['instructions'], ['Mix'])
+        # Connection check + pass 1 only; no structuring call
+        self.assertEqual(svc._client.chat.call_count, 2)
+
+    @patch('receipe_transcriber.services.ollama_service._SKIP_OLLAMA', False)
+    def test_transcribe_structures_when_pass_one_json_is_title_only(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        image_path = os.path.join(tmp.name, 'svc.jpg')
+        with open(image_path, 'wb') as f:
+            f.write(b'xyz')
+
+        svc = OllamaService()
+        svc._client = MagicMock()
+        svc._client.chat.return_value = SimpleNamespace(
+            message=SimpleNamespace(
+                content='{"title": "Grandma\'s Card"}\n2 cups flour\nMix well',
+                thinking=None,
+            )
+        )
+        recipe = {'title': "Grandma's Card", 'ingredients': [], 'instructions': ['Mix']}
+        with patch.object(
+            svc, '_structure_text_to_recipe', return_value=recipe
+        ) as structure:
+            result = svc.transcribe_recipe(image_path)
+
+        structure.assert_called_once()
+        self.assertEqual(result['instructions'], ['Mix'])
+
+    def test_structured_result_is_reused_for_identical_text(self):
+        svc = OllamaService()
+        recipe = {'title': 'Cached', 'ingredients': [], 'instructions': ['Stir']}
+        with patch.object(
+            svc, '_structure_text_to_recipe', return_value=recipe
+        ) as structure:
+            first = svc._structure_text_cached('same text')
+            first['instructions'].append('Mutated')
+            second = svc._structure_text_cached('same text')
+
+        structure.assert_called_once_with('same text')
+        self.assertEqual(second['instructions'], ['Stir'])
+
+    @patch('receipe_transcriber.services.ollama_service._SKIP_OLLAMA', False)
+    def test_reprocess_structures_identical_text_again(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        image_path = os.path.join(tmp.name, 'svc.jpg')
+        with open(image_path, 'wb') as f:
+            f.write(b'xyz')
+
+        svc = OllamaService()
+        svc._client = MagicMock()
+        svc._client.chat.return_value = SimpleNamespace(
+            message=SimpleNamespace(content='2 cups flour\nMix well', thinking=None)
+        )
+        stale = {'title': 'Stale', 'ingredients': [], 'instructions': ['Stir']}
+        fresh = {'title': 'Fresh', 'ingredients': [], 'instructions': ['Fold']}
+        with patch.object(
+            svc, '_structure_text_to_recipe', side_effect=[stale, fresh]
+        ) as structure:
+            svc.transcribe_recipe(image_path)
+            reprocessed = svc.transcribe_recipe(image_path, use_cache=False)
+            later = svc.transcribe_recipe(image_path)
+
+        self.assertEqual(structure.call_count, 2)
+        self.assertEqual(reprocessed['title'], 'Fresh')
+        # The fresh result replaced the cached one
+        self.assertEqual(later['title'], 'Fresh')
 
 if __name__ == '__main__':
     unittest.main()
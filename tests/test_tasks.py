@@ -3,21 +3,28 @@ import tempfile
 import unittest
 from unittest.mock import patch
 
-from receipe_transcriber.tasks.transcription_tasks import transcribe_recipe_task
+from receipe_transcriber.tasks import transcription_tasks
+from receipe_transcriber.tasks.transcription_tasks import (
+    delete_image_file,
+    get_recipe_data,
+    normalize_recipe_data,
+    transcribe_recipe_task,
+)
 
 
 class TasksTestCase(unittest.TestCase):
     def setUp(self):
-        os.environ["SKIP_OLLAMA"] = "1"
+        patcher = patch.object(transcription_tasks, "_SKIP_OLLAMA", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_dir = tmp.name
 
-    def tearDown(self):
-        os.environ["SKIP_OLLAMA"] = "0"
-
-    @patch("receipe_transcriber.tasks.transcription_tasks.requests.post")
+    @patch.object(transcription_tasks._session, "post")
     def test_transcribe_recipe_task_returns_payload_and_posts_hooks(self, mock_post):
-        image_path = os.path.join(tempfile.gettempdir(), "task.jpg")
-        with open(image_path, "wb") as f:
-            f.write(b"xyz")
+        # Mock mode never opens the image, so the path need not exist
+        image_path = "/tmp/fake-task.jpg"
 
         # Call task with correct signature: (image_path, status_hook, complete_hook, ext_id, is_reprocessing)
         result = transcribe_recipe_task.run(
@@ -28,23 +35,92 @@ class TasksTestCase(unittest.TestCase):
             False,
         )
 
-        # Should return structured payload
-        self.assertIsInstance(result, dict)
-        self.assertEqual(result["external_recipe_id"], "ext-123")
-        self.assertIn("ingredients", result)
-        self.assertIn("instructions", result)
-
-        # Multiple webhook posts: status updates + completion
-        self.assertGreaterEqual(mock_post.call_count, 2)
-        # At least one status call uses data= with form encoding
-        status_calls = [c for c in mock_post.call_args_list if "data" in c[1]]
-        self.assertGreater(len(status_calls), 0)
-        # Final completion call uses json= body
-        complete_call = mock_post.call_args_list[-1]
+        # One task run, checked per aspect so failures stay granular
+        with self.subTest(aspect="payload"):
+            self.assertIsInstance(result, dict)
+            self.assertEqual(result["external_recipe_id"], "ext-123")
+            self.assertIn("ingredients", result)
+            self.assertIn("instructions", result)
+
+        with self.subTest(aspect="webhooks"):
+            # Multiple webhook posts: status updates + completion
+            calls = mock_post.call_args_list
+            self.assertGreaterEqual(len(calls), 2)
+            # At least one status call uses data= with form encoding
+            self.assertTrue(any("data" in c.kwargs for c in calls))
+            # Final completion call uses json= body
+            self.assertEqual(
+                calls[-1].kwargs.get("json", {}).get("external_recipe_id"), "ext-123"
+            )
+
+    @patch.object(transcription_tasks, "ollama_service")
+    @patch.object(transcription_tasks, "_redis")
+    def test_get_recipe_data_uses_cache_unless_reprocessing(
+        self, mock_redis, mock_svc
+    ):
+        image_path = os.path.join(self.tmp_dir, "task-cache.jpg")
+        with open(image_path, "wb") as f:
+            f.write(b"same bytes")
+        mock_redis.get.return_value = b'{"title": "Cached"}'
+        mock_svc.transcribe_recipe.return_value = {"title": "Fresh"}
+
+        with patch.object(transcription_tasks, "_SKIP_OLLAMA", False):
+            cached = get_recipe_data(image_path)
+            fresh = get_recipe_data(image_path, use_cache=False)
+
+        self.assertEqual(cached, {"title": "Cached"})
+        self.assertEqual(fresh, {"title": "Fresh"})
+        mock_svc.transcribe_recipe.assert_called_once()
+        # The service is told to skip its structuring cache too
+        self.assertIs(mock_svc.transcribe_recipe.call_args[1]["use_cache"], False)
+        # Reprocessing skips the lookup, then replaces the cached result
+        # under the same key
+        mock_redis.get.assert_called_once()
         self.assertEqual(
-            complete_call[1].get("json", {}).get("external_recipe_id"), "ext-123"
+            mock_redis.setex.call_args[0][0], mock_redis.get.call_args[0][0]
+        )
+
+    @patch.object(transcription_tasks, "ollama_service")
+    @patch.object(transcription_tasks, "_redis")
+    def test_get_recipe_data_missing_image_skips_cache(self, mock_redis, mock_svc):
+        image_path = os.path.join(self.tmp_dir, "missing.jpg")
+        mock_svc.transcribe_recipe.side_effect = FileNotFoundError(
+            f"Image file not found: {image_path}"
         )
 
+        with patch.object(transcription_tasks, "_SKIP_OLLAMA", False):
+            with self.assertRaisesRegex(FileNotFoundError, "Image file not found"):
+                get_recipe_data(image_path)
+
+        mock_redis.get.assert_not_called()
+        mock_redis.setex.assert_not_called()
+
+    def test_normalize_recipe_data_flattens_list_fields(self):
+        result = normalize_recipe_data(
+            {
+                "cook_time": ["10 min", None, "20 min"],
+                "notes": ["Chill first", "", "Serve warm"],
+                "servings": 4,
+            }
+        )
+
+        self.assertEqual(result["title"], "Untitled Recipe")
+        self.assertEqual(result["cook_time"], "10 min, 20 min")
+        self.assertEqual(result["notes"], "Chill first\nServe warm")
+        self.assertEqual(result["servings"], "4")
+        self.assertEqual(result["ingredients"], [])
+
+    def test_delete_image_file_removes_file_and_tolerates_missing(self):
+        image_path = os.path.join(self.tmp_dir, "task-delete.jpg")
+        with open(image_path, "wb") as f:
+            f.write(b"xyz")
+
+        delete_image_file.run(image_path)
+        self.assertFalse(os.path.exists(image_path))
+
+        # Already gone: should not raise
+        delete_image_file.run(image_path)
+
 
 if __name__ == "__main__":
     unittest.main()
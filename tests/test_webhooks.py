@@ -0,0 +1,192 @@
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from receipe_transcriber import create_app, db
+from receipe_transcriber.models import Recipe, TranscriptionJob
+
+from . import UploadTestingConfig
+
+
+RECIPE_PAYLOAD = {
+    "external_recipe_id": "ext-hook",
+    "title": "Webhook Recipe",
+    "image_path": "/tmp/hook.jpg",
+    "prep_time": "5 minutes",
+    "cook_time": None,
+    "servings": "2",
+    "notes": None,
+    "ingredients": [
+        {"item": "flour", "quantity": "2", "unit": "cups"},
+        {"item": "eggs", "quantity": "3", "unit": None},
+    ],
+    "instructions": ["Mix", "Bake"],
+}
+
+
+class WebhooksTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Build the app once; each test still gets fresh tables
+        cls.app = create_app(UploadTestingConfig)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.app.config["UPLOAD_FOLDER"], ignore_errors=True)
+
+    def setUp(self):
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(
+                TranscriptionJob(
+                    external_recipe_id="ext-hook",
+                    session_id="sess",
+                    image_path="/tmp/hook.jpg",
+                )
+            )
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_update_status_updates_job(self):
+        resp = self.client.post(
+            "/update-status",
+            data={
+                "external_recipe_id": "ext-hook",
+                "status": "processing",
+                "message": "Reading image",
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        with self.app.app_context():
+            job = db.session.query(TranscriptionJob).one()
+            self.assertEqual(job.status, "processing")
+            self.assertEqual(job.last_status, "Reading image")
+            self.assertIsNone(job.completed_at)
+
+    @patch("receipe_transcriber.routes.webhooks.push_job_card")
+    def test_update_status_skips_repeated_status(self, mock_push):
+        data = {
+            "external_recipe_id": "ext-hook",
+            "status": "processing",
+            "message": "Reading image",
+        }
+        self.client.post("/update-status", data=data)
+        resp = self.client.post("/update-status", data=data)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_push.call_count, 1)
+
+        self.client.post("/update-status", data=dict(data, message="Structuring"))
+        self.assertEqual(mock_push.call_count, 2)
+
+    @patch("receipe_transcriber.routes.webhooks.turbo")
+    def test_update_status_pushes_only_the_job_card(self, mock_turbo):
+        mock_turbo.can_push.return_value = True
+        self.client.post(
+            "/update-status",
+            data={
+                "external_recipe_id": "ext-hook",
+                "status": "processing",
+                "message": "Reading image",
+            },
+        )
+        args, kwargs = mock_turbo.replace.call_args
+        self.assertEqual(kwargs, {"target": "recipe-ext-hook"})
+        content = args[0]
+        self.assertIn('id="recipe-ext-hook"', content)
+        self.assertIn("Reading image", content)
+        self.assertNotIn("results-area", content)
+
+    def test_update_status_failed_marks_job_completed(self):
+        self.client.post(
+            "/update-status",
+            data={
+                "external_recipe_id": "ext-hook",
+                "status": "failed",
+                "message": "Boom",
+            },
+        )
+        with self.app.app_context():
+            job = db.session.query(TranscriptionJob).one()
+            self.assertEqual(job.error_message, "Boom")
+            self.assertIsNotNone(job.completed_at)
+
+    def test_update_status_unknown_job_is_acknowledged(self):
+        resp = self.client.post(
+            "/update-status",
+            data={"external_recipe_id": "missing", "status": "processing"},
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @patch("receipe_transcriber.routes.webhooks.turbo")
+    def test_record_recipe_pushes_recipe_card_for_new_recipe(self, mock_turbo):
+        mock_turbo.can_push.return_value = True
+        self.client.post("/record-recipe", json=RECIPE_PAYLOAD)
+        args, kwargs = mock_turbo.replace.call_args
+        self.assertEqual(kwargs, {"target": "recipe-ext-hook"})
+        self.assertIn("Webhook Recipe", args[0])
+        self.assertIn("flour", args[0])
+
+        # Reprocessing refreshes the whole results area instead
+        self.client.post("/record-recipe", json=RECIPE_PAYLOAD)
+        self.assertEqual(mock_turbo.replace.call_args[1], {"target": "results-area"})
+
+    @patch("receipe_transcriber.routes.webhooks.turbo")
+    def test_record_recipe_first_recipe_removes_empty_placeholder(self, mock_turbo):
+        mock_turbo.can_push.return_value = True
+        self.client.post("/record-recipe", json=RECIPE_PAYLOAD)
+        mock_turbo.remove.assert_called_once_with(target="empty-placeholder")
+        self.assertEqual(
+            mock_turbo.push.call_args[0][0],
+            [mock_turbo.replace.return_value, mock_turbo.remove.return_value],
+        )
+
+    @patch("receipe_transcriber.routes.webhooks.turbo")
+    def test_record_recipe_past_recent_limit_refreshes_results_area(self, mock_turbo):
+        with self.app.app_context():
+            db.session.add_all(
+                Recipe(external_recipe_id=f"old-{n}", title=f"Old {n}")
+                for n in range(5)
+            )
+            db.session.commit()
+
+        mock_turbo.can_push.return_value = True
+        self.client.post("/record-recipe", json=RECIPE_PAYLOAD)
+        self.assertEqual(mock_turbo.replace.call_args[1], {"target": "results-area"})
+        mock_turbo.remove.assert_not_called()
+
+    def test_record_recipe_creates_then_replaces_recipe(self):
+        resp = self.client.post("/record-recipe", json=RECIPE_PAYLOAD)
+        self.assertEqual(resp.status_code, 200)
+
+        reprocessed = dict(
+            RECIPE_PAYLOAD,
+            title="Reprocessed",
+            ingredients=[{"item": "sugar", "quantity": "1", "unit": "cup"}],
+            instructions=["Stir"],
+        )
+        resp = self.client.post("/record-recipe", json=reprocessed)
+        self.assertEqual(resp.status_code, 200)
+
+        with self.app.app_context():
+            recipe = db.session.query(Recipe).one()
+            self.assertEqual(recipe.title, "Reprocessed")
+            self.assertEqual(
+                [(i.item, i.order) for i in recipe.ingredients], [("sugar", 1)]
+            )
+            self.assertEqual(
+                [(i.step_number, i.description) for i in recipe.instructions],
+                [(1, "Stir")],
+            )
+            job = db.session.query(TranscriptionJob).one()
+            self.assertEqual(job.status, "completed")
+            self.assertIsNotNone(job.completed_at)
+
+
+if __name__ == "__main__":
+    unittest.main()